@@ -1,20 +1,32 @@
-from fastapi import FastAPI, HTTPException, Depends, Header, Request, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, BackgroundTasks, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Dict, Any, Tuple
+from uuid import UUID
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import secrets
 import urllib.parse
-import requests
+import httpx
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from postgrest.exceptions import APIError as PostgrestAPIError
+from postgrest.types import ReturnMethod
+from cachetools import TLRUCache, TTLCache
+from jose import jwt
+from jose.exceptions import JWTError
+import hashlib
+import orjson
 import logging
 import asyncio
+import time
 
 # Load environment variables FIRST, before any imports that depend on them
 load_dotenv()
@@ -25,6 +37,7 @@ from services.llm_service import LLMService
 from services.google_custom_search_service import GoogleCustomSearchService
 from services.database_service import DatabaseService
 from services.workflow_orchestrator import WorkflowOrchestrator
+from services.oauth_state_store import OAuthStateStore
 from utils.supabase_utils import Tables
 
 # Set up logging
@@ -35,31 +48,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# CORS middleware
+# Exact origin allow-list; a frozenset so CORSMiddleware's per-request origin check is a hash lookup
+CORS_ALLOWED_ORIGINS = frozenset((
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+    "http://localhost:8080",
+    "http://127.0.0.1:8080",
+    "http://localhost:3000",
+    "https://leadsgenie.vercel.app",
+))
+
+# Valid values for experience_operator in search and preference requests
+VALID_EXPERIENCE_OPERATORS = frozenset((">", "<", "="))
+
+# CORS middleware (answers every preflight before routing, so no OPTIONS routes are needed)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:8080", "http://127.0.0.1:8080", "http://localhost:3000", "https://leadsgenie.vercel.app"],
+    allow_origins=CORS_ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
     expose_headers=["*"],
+    max_age=3600,
 )
 
+# Compress larger JSON bodies (lead previews, preference payloads); small responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {exc.errors()}")
-    return JSONResponse(
+    errors = exc.errors()
+    logger.error(f"Validation error: {errors}")
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors()},
+        content={"detail": errors},
     )
 
 # Initialize Supabase client
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+# Optional: the project's JWT secret lets us verify access tokens locally instead of calling GoTrue
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 
 if not SUPABASE_URL:
     raise ValueError("SUPABASE_URL must be set in environment variables")
@@ -70,6 +103,13 @@ if not SUPABASE_SERVICE_KEY:
         "This should be the SERVICE_ROLE key (secret), not the ANON key (publishable)."
     )
 
+# Service role keys are JWTs; fail at startup rather than on every save-preferences request
+if not SUPABASE_SERVICE_KEY.startswith('eyJ'):
+    raise ValueError(
+        "SUPABASE_SERVICE_ROLE_KEY must be a JWT (starts with 'eyJ').\n"
+        "Copy the service_role key from Supabase Dashboard → Project Settings → API."
+    )
+
 if not SUPABASE_ANON_KEY:
     raise ValueError(
         "SUPABASE_ANON_KEY must be set in environment variables.\n"
@@ -90,6 +130,58 @@ supabase: Client = create_client(
 # Anon key client for auth operations (validates user sessions properly)
 supabase_auth: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
 
+# Connection pool for request-path PostgREST queries; size it to the expected concurrent requests per worker
+SUPABASE_POOL_MAX = int(os.getenv("SUPABASE_POOL_MAX", "100"))
+SUPABASE_POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "50"))
+
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose session multiplexes queries over HTTP/2 keep-alive connections"""
+    
+    def create_session(self, base_url: str, headers: Dict[str, str], timeout) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_POOL_MAX,
+                max_keepalive_connections=SUPABASE_POOL_KEEPALIVE,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+# Async PostgREST client (service role) for request-path queries. It talks to the same
+# REST endpoint as `supabase` but over a shared httpx.AsyncClient, so handlers can await
+# database calls without blocking the event loop.
+supabase_rest = PooledAsyncPostgrestClient(
+    f"{SUPABASE_URL}/rest/v1",
+    headers={
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apikey": SUPABASE_SERVICE_KEY,
+        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+    },
+)
+
+# GoTrue endpoint that returns the user a bearer token belongs to
+SUPABASE_AUTH_USER_URL = f"{SUPABASE_URL}/auth/v1/user"
+# Public keys for projects that sign access tokens with asymmetric (ES256/RS256) keys
+SUPABASE_JWKS_URL = f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+
+# Shared async HTTP client for Supabase Auth and third-party APIs (LinkedIn OAuth), so outbound calls don't
+# block the event loop and reuse keep-alive (HTTP/2 where the server supports it) connections across requests
+http_client = httpx.AsyncClient(
+    timeout=10.0,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close pooled HTTP connections on shutdown"""
+    await supabase_rest.aclose()
+    await http_client.aclose()
+    await oauth_states.close()
+
 # Initialize LinkedIn Search Service
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY_ForSearchLinkedIn")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
@@ -112,8 +204,7 @@ llm_service = LLMService()
 # Initialize Google Custom Search Service (general purpose)
 google_custom_search_service = GoogleCustomSearchService(GOOGLE_API_KEY, GOOGLE_CSE_ID)
 
-# Initialize Database Service
-llm_service = LLMService()
+# Initialize Database Service (shares the module-level Supabase and LLM clients)
 database_service = DatabaseService(supabase, llm_service)
 
 # Initialize Workflow Orchestrator
@@ -137,11 +228,45 @@ LINKEDIN_PROFILE_API = "https://api.linkedin.com/v2/userinfo"
 # Alternative: LinkedIn REST API v2 endpoint (if OpenID Connect doesn't work)
 LINKEDIN_REST_API = "https://api.linkedin.com/v2/me"
 
-# Store OAuth state temporarily (in production, use Redis or database)
-oauth_states = {}
+# Authorization URL with the per-deployment constant parameters already encoded;
+# connect_linkedin only appends the per-request redirect_uri and state
+LINKEDIN_AUTH_URL_PREFIX = f"{LINKEDIN_AUTH_URL}?" + urllib.parse.urlencode({
+    "response_type": "code",
+    "client_id": LINKEDIN_CLIENT_ID or "",
+    "scope": "openid profile email"  # Request basic profile info
+})
+
+# Lead inserts of at least LEADS_BATCH_THRESHOLD rows are split into
+# LEADS_BATCH_SIZE-row batches that are sent concurrently
+LEADS_BATCH_SIZE = 25
+LEADS_BATCH_THRESHOLD = 50
+
+# Columns the LLM classification prompts read from leads and companies
+CLASSIFY_LEAD_COLUMNS = "id, contact_person, contact_email, role, company_name"
+CLASSIFY_COMPANY_COLUMNS = "name, industry, location, description, annual_revenue"
+
+# Seconds a lead generation job may stay pending/running before polling reports it failed
+LEAD_GENERATION_JOB_TIMEOUT = 900
+
+# Seconds an LLM classification is reused for an identical lead/company prompt input
+CLASSIFICATION_CACHE_TTL = 600
+
+# prompt input digest -> classification
+classification_cache = TTLCache(maxsize=10_000, ttl=CLASSIFICATION_CACHE_TTL)
+
+# Health check body never changes, so it is serialized once at import
+HEALTH_RESPONSE_BODY = b'{"status":"ok"}'
+
+# OAuth state store (Redis when REDIS_URL is set, so states survive across workers)
+oauth_states = OAuthStateStore(os.getenv("REDIS_URL"))
 
 # Request/Response Models
+# Request models validate untrusted input and reject unknown fields (extra="forbid");
+# responses assembled from our own data are built with model_construct() to skip
+# re-running validation.
 class LinkedInConnectRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     user_id: str
     redirect_uri: str
 
@@ -150,6 +275,8 @@ class LinkedInConnectResponse(BaseModel):
     state: str
 
 class LinkedInCallbackRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     code: str
     state: str
     user_id: str
@@ -159,6 +286,8 @@ class LinkedInCallbackResponse(BaseModel):
     error: Optional[str] = None
 
 class LinkedInSearchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     locations: List[str]
     positions: List[str]
     experience_operator: str = "="
@@ -173,6 +302,8 @@ class LinkedInSearchResponse(BaseModel):
     error: Optional[str] = None
 
 class SavePreferencesRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     tenant_id: str
     # General preferences
     target_industry: Optional[str] = None
@@ -198,16 +329,30 @@ class GetPreferencesResponse(BaseModel):
     error: Optional[str] = None
 
 class GenerateLeadsRequest(BaseModel):
-    tenant_id: str
+    model_config = ConfigDict(extra="forbid")
+    
+    tenant_id: UUID  # parsed once here; malformed ids are rejected with a 422
     preview_only: Optional[bool] = False
 
 class GenerateLeadsResponse(BaseModel):
+    # Documents the body rendered by _generate_leads_response; nothing extends or mutates it
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     success: bool
     leads_created: int
     leads: Optional[List[Dict[str, Any]]] = None
     error: Optional[str] = None
 
+class GenerateLeadsJobResponse(BaseModel):
+    job_id: str
+    status: str  # pending, running, completed or failed
+    leads_created: int = 0
+    leads: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
 class ReleaseLeadsRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     tenant_id: str
     leads: List[Dict[str, Any]]
 
@@ -218,6 +363,8 @@ class ReleaseLeadsResponse(BaseModel):
     error: Optional[str] = None
 
 class SignUpRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     email: str
     password: str
     full_name: str
@@ -230,37 +377,155 @@ class SignUpResponse(BaseModel):
     error: Optional[str] = None
 
 # Authentication
-def verify_auth(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+# Seconds a verified token's user info is reused before re-checking with Supabase
+AUTH_CACHE_TTL = 300
+
+def _auth_cache_ttu(key: bytes, value: tuple, now: float) -> float:
+    """Expire a cached auth result after AUTH_CACHE_TTL or when its token expires, whichever is first"""
+    _, token_exp = value
+    ttl = AUTH_CACHE_TTL if token_exp is None else min(AUTH_CACHE_TTL, token_exp - time.time())
+    return now + ttl
+
+# token digest -> (user info, token exp)
+auth_cache = TLRUCache(maxsize=10_000, ttu=_auth_cache_ttu)
+
+def _auth_cache_key(token: str) -> bytes:
+    """Hash the token so raw JWTs are not kept in memory as cache keys"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _unverified_claims(token: str) -> Dict[str, Any]:
+    """Read the token's claims WITHOUT verifying its signature; never trust these on their own"""
+    try:
+        return jwt.get_unverified_claims(token)
+    except JWTError:
+        return {}
+
+def _token_exp(token: str) -> Optional[float]:
+    """Read the token's exp claim (only used to bound cache lifetime)"""
+    exp = _unverified_claims(token).get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+# Seconds the project's JWKS is reused before it is fetched again (picks up key rotation)
+JWKS_CACHE_TTL = 600
+
+# "keys" -> {kid: JWK}
+jwks_cache = TTLCache(maxsize=1, ttl=JWKS_CACHE_TTL)
+
+async def _get_signing_keys() -> Dict[str, Dict[str, Any]]:
+    """Fetch (and cache) the project's public signing keys by kid; empty if unavailable"""
+    keys = jwks_cache.get("keys")
+    if keys is None:
+        try:
+            response = await http_client.get(SUPABASE_JWKS_URL)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Could not fetch Supabase JWKS: {e}")
+            keys = {}
+        jwks_cache["keys"] = keys
+    return keys
+
+async def _verify_token_locally(token: str) -> Optional[str]:
+    """Verify an access token in-process and return its user id (sub)
+    
+    HS256 tokens are checked with the project's JWT secret; asymmetric tokens with the
+    matching key from the project's JWKS. Returns None if the token can't be verified
+    locally (no secret, unknown kid, bad signature), in which case callers fall back to GoTrue.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError:
+        return None
+    
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        key = SUPABASE_JWT_SECRET
+    elif algorithm in ("ES256", "RS256"):
+        key = (await _get_signing_keys()).get(header.get("kid"))
+    else:
+        key = None
+    if not key:
+        return None
+    
+    try:
+        payload = jwt.decode(token, key, algorithms=[algorithm], audience="authenticated")
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+async def _fetch_user_profile(user_id: str):
+    """Fetch the user_profiles columns verify_auth needs (service role, bypasses RLS)"""
+    return await supabase_rest.table("user_profiles").select("tenant_id, is_admin").eq("id", user_id).limit(1).execute()
+
+async def _fetch_auth_user_id(token: str) -> Optional[str]:
+    """Ask Supabase Auth (GoTrue) which user a token belongs to; None if the token is rejected"""
+    response = await http_client.get(
+        SUPABASE_AUTH_USER_URL,
+        headers={"apikey": SUPABASE_ANON_KEY, "Authorization": f"Bearer {token}"},
+    )
+    if response.status_code in (401, 403):
+        return None
+    response.raise_for_status()
+    return response.json().get("id")
+
+async def verify_auth(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
     """Verify JWT token and return user info"""
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
     token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
     
+    cache_key = _auth_cache_key(token)
+    cached = auth_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached[0])
+    
     try:
-        # Use anon key client for auth verification (validates user sessions properly)
-        response = supabase_auth.auth.get_user(token)
-        
-        if not response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        user_id = await _verify_token_locally(token)
         
-        # Use service role client for database queries (bypasses RLS)
-        profile_result = supabase.table("user_profiles").select("tenant_id").eq("id", response.user.id).limit(1).execute()
+        if user_id is not None:
+            profile_result = await _fetch_user_profile(user_id)
+        else:
+            # Validate the session with GoTrue (anon key) on the shared async HTTP client.
+            # The token's (unverified) sub claim is the user id, so look the profile up concurrently
+            # and only use the result once GoTrue has confirmed that id.
+            claimed_user_id = _unverified_claims(token).get("sub")
+            lookups = [_fetch_auth_user_id(token)]
+            if claimed_user_id:
+                lookups.append(_fetch_user_profile(claimed_user_id))
+            results = await asyncio.gather(*lookups, return_exceptions=True)
+            
+            user_id = results[0]
+            if isinstance(user_id, BaseException):
+                raise user_id
+            
+            if not user_id:
+                raise HTTPException(status_code=401, detail="Invalid token")
+            
+            if claimed_user_id == user_id:
+                profile_result = results[1]
+                if isinstance(profile_result, BaseException):
+                    raise profile_result
+            else:
+                profile_result = await _fetch_user_profile(user_id)
         
-        if not profile_result.data or len(profile_result.data) == 0:
+        if not profile_result.data:
             raise HTTPException(
                 status_code=404,
                 detail="User profile not found. Please complete your profile setup in the application."
             )
         
-        tenant_id = profile_result.data[0].get("tenant_id")
+        profile = profile_result.data[0]
         
         # All users now have a tenant_id (private users get a private tenant created automatically)
         
-        return {
-            "user_id": response.user.id,
-            "tenant_id": tenant_id  # Always present now (private users have private tenants)
+        user_info = {
+            "user_id": user_id,
+            "tenant_id": profile.get("tenant_id"),  # Always present now (private users have private tenants)
+            "is_admin": bool(profile.get("is_admin"))
         }
+        auth_cache[cache_key] = (user_info, _token_exp(token))
+        return dict(user_info)
     except HTTPException:
         raise
     except PostgrestAPIError as e:
@@ -275,91 +540,25 @@ def verify_auth(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
         logger.error(f"Authentication error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
-def verify_admin(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
-    """Verify JWT token and check if user is admin"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header required")
+async def verify_admin(user_info: Dict[str, Any] = Depends(verify_auth)) -> Dict[str, Any]:
+    """Verify JWT token and check if user is admin
     
-    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
+    verify_auth already loads is_admin with the profile (and caches it with the token),
+    so this needs no extra database call.
+    """
+    if not user_info["is_admin"]:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    try:
-        # Use anon key client for auth verification (validates user sessions properly)
-        response = supabase_auth.auth.get_user(token)
-        
-        if not response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # Use service role client for database queries (bypasses RLS)
-        profile_result = supabase.table("user_profiles").select("is_admin, tenant_id").eq("id", response.user.id).single().execute()
-        
-        if not profile_result.data:
-            raise HTTPException(status_code=404, detail="User profile not found")
-        
-        is_admin = profile_result.data.get("is_admin", False)
-        
-        if not is_admin:
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        # Return user info with tenant_id (may be None for admins, which is fine)
-        return {
-            "user_id": response.user.id,
-            "tenant_id": profile_result.data.get("tenant_id")  # May be None for admins
-        }
-    except HTTPException:
-        raise
-    except PostgrestAPIError as e:
-        error_dict = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
-        if error_dict.get('code') == 'PGRST116':
-            raise HTTPException(
-                status_code=404,
-                detail="User profile not found. Please complete your profile setup in the application."
-            )
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    except Exception as e:
-        logger.error(f"Admin verification error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Admin verification failed: {str(e)}")
+    # tenant_id may be None for admins, which is fine
+    return user_info
 
-def verify_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
-    """Verify JWT token and return user info without requiring tenant_id"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header required")
+async def verify_user(user_info: Dict[str, Any] = Depends(verify_auth)) -> Dict[str, Any]:
+    """Verify JWT token and return user info without requiring tenant_id
     
-    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-    
-    try:
-        # Use anon key client for auth verification (validates user sessions properly)
-        response = supabase_auth.auth.get_user(token)
-        
-        if not response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # Use service role client for database queries (bypasses RLS)
-        profile_result = supabase.table("user_profiles").select("tenant_id").eq("id", response.user.id).limit(1).execute()
-        
-        if not profile_result.data or len(profile_result.data) == 0:
-            raise HTTPException(
-                status_code=404,
-                detail="User profile not found. Please complete your profile setup in the application."
-            )
-        
-        # Return user info with tenant_id (may be None, which is fine for LinkedIn connection)
-        return {
-            "user_id": response.user.id,
-            "tenant_id": profile_result.data[0].get("tenant_id")  # May be None
-        }
-    except HTTPException:
-        raise
-    except PostgrestAPIError as e:
-        error_dict = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
-        if error_dict.get('code') == 'PGRST116':
-            raise HTTPException(
-                status_code=404,
-                detail="User profile not found. Please complete your profile setup in the application."
-            )
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    except Exception as e:
-        logger.error(f"User verification error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
+    Shares verify_auth's token cache, so repeat requests skip GoTrue and the profile lookup.
+    """
+    # tenant_id may be None, which is fine for LinkedIn connection
+    return user_info
 
 @app.post("/api/signup", response_model=SignUpResponse)
 async def signup(request: SignUpRequest):
@@ -372,16 +571,16 @@ async def signup(request: SignUpRequest):
     4. If no match -> creates a private tenant (never creates domain-based tenants)
     5. Creates user_profile with assigned tenant_id
     
+    Steps 3-5 run in the signup_provision_tenant database function, so they take a single
+    round-trip and a failure leaves no orphaned tenant behind.
     Uses service role key to bypass RLS for tenant and profile creation.
     """
-    tenant_id = None
-    user_id = None
-    
     try:
         # Step 0: Check if user already exists (by email in user_profiles or auth)
-        existing_profile = supabase.table("user_profiles").select("id, email").eq("email", request.email).limit(1).execute()
+        # Existence check only: fetch just the id of at most one row
+        existing_profile = await supabase_rest.table("user_profiles").select("id").eq("email", request.email).limit(1).execute()
         
-        if existing_profile.data and len(existing_profile.data) > 0:
+        if existing_profile.data:
             logger.warning(f"Signup attempted for existing user: {request.email}")
             return SignUpResponse(
                 success=False,
@@ -391,7 +590,8 @@ async def signup(request: SignUpRequest):
         # Step 1: Create user via Supabase Auth (using anon key client)
         # Note: sign_up will return an error if user already exists
         try:
-            auth_response = supabase_auth.auth.sign_up({
+            # supabase-py's auth client is synchronous; run it in the threadpool to keep the event loop free
+            auth_response = await run_in_threadpool(supabase_auth.auth.sign_up, {
                 "email": request.email,
                 "password": request.password,
                 "options": {
@@ -414,278 +614,63 @@ async def signup(request: SignUpRequest):
             raise
         
         if auth_response.user is None:
-            # Check for error in response
-            error_msg = "Failed to create user account"
-            if hasattr(auth_response, 'session') and auth_response.session:
-                if hasattr(auth_response.session, 'error'):
-                    error_msg = str(auth_response.session.error)
-                elif hasattr(auth_response.session, 'user') and auth_response.session.user is None:
-                    # User creation failed
-                    error_msg = "Failed to create user account. The email may already be registered."
-            
-            # Also check if there's an error attribute
-            if hasattr(auth_response, 'error') and auth_response.error:
-                error_msg = str(auth_response.error)
-            
+            # AuthResponse only carries user/session; GoTrue errors are raised, not returned
             return SignUpResponse(
                 success=False,
-                error=error_msg
+                error="Failed to create user account"
             )
         
         user_id = auth_response.user.id
         
-        # Step 1.5: Check if user_profile already exists (might be created by trigger)
-        # IMPORTANT: Check BEFORE creating tenant to avoid orphaned tenants
-        existing_profile_by_id = supabase.table("user_profiles").select("id, email, tenant_id").eq("id", user_id).limit(1).execute()
+        # Step 2: Assign a tenant and create the profile in one transaction (see the
+        # signup_provision_tenant migration): keep an existing profile's tenant, else join the
+        # tenant matching the email domain, else create a private tenant; then upsert the profile.
+        # Retry while the new auth user is not yet visible to the database (FK violation).
+        max_retries = 5
+        retry_delay = 0.5  # seconds
         
-        if existing_profile_by_id.data and len(existing_profile_by_id.data) > 0:
-            # Profile already exists - check if it's the same email
-            existing_email = existing_profile_by_id.data[0].get("email")
-            existing_tenant_id = existing_profile_by_id.data[0].get("tenant_id")
-            
-            if existing_email and existing_email.lower() != request.email.lower():
-                logger.warning(f"User {user_id} already exists with different email: {existing_email}")
-                return SignUpResponse(
-                    success=False,
-                    error="A user with this email address already exists. Please sign in instead."
-                )
-            
-            # If profile exists and has tenant_id, use that tenant (don't create new one)
-            if existing_tenant_id:
-                logger.info(f"User profile already exists for {user_id} with tenant {existing_tenant_id}, updating info only")
-                # Just update the profile with latest info
-                update_result = supabase.table("user_profiles").update({
-                    "email": request.email,
-                    "full_name": request.full_name,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", user_id).execute()
+        for attempt in range(max_retries):
+            try:
+                provision_result = await supabase_rest.rpc("signup_provision_tenant", {
+                    "p_user_id": user_id,
+                    "p_email": request.email,
+                    "p_full_name": request.full_name,
+                }).execute()
+                break
+            except PostgrestAPIError as e:
+                error_code = e.code or ''
                 
-                if update_result.data:
-                    return SignUpResponse(
-                        success=True,
-                        user_id=user_id,
-                        tenant_id=existing_tenant_id
-                    )
-                else:
+                if error_code == '23503' and attempt < max_retries - 1:
+                    logger.warning(f"FK violation on attempt {attempt + 1}, auth user may not be visible yet. Retrying in {retry_delay}s...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 1.5  # Exponential backoff
+                    continue
+                
+                if error_code == 'LG001':
+                    # Profile for this user id already belongs to a different email
+                    logger.warning(f"User {user_id} already exists with a different email")
                     return SignUpResponse(
                         success=False,
-                        error="Failed to update existing user profile"
+                        error="A user with this email address already exists. Please sign in instead."
                     )
-            
-            # Profile exists but no tenant_id - we'll create/assign tenant below
-            logger.info(f"User profile already exists for {user_id} without tenant, will assign tenant")
-        
-        # Step 2: Determine tenant assignment
-        # ANY user without matching domain gets private tenant (not just generic email providers)
-        email_domain = request.email.split('@')[1].lower() if '@' in request.email else None
-        tenant_id = None
-        
-        if email_domain:
-            # Check if a tenant exists with matching domain (using service role, bypasses RLS)
-            tenant_result = supabase.table("tenants").select("id, name").eq("domain", email_domain).limit(1).execute()
-            
-            if tenant_result.data and len(tenant_result.data) > 0:
-                # Assign user to existing tenant (only if domain matches)
-                tenant_id = tenant_result.data[0]["id"]
-                tenant_name = tenant_result.data[0].get("name", "Unknown")
-                logger.info(f"Assigned user {user_id} to existing tenant {tenant_id} (domain: {email_domain}, name: {tenant_name})")
-            else:
-                # No matching tenant - will create private tenant below
-                logger.info(f"No tenant found for domain {email_domain}, will create private tenant")
-        
-        # Step 3: Create private tenant if no matching tenant found
-        if not tenant_id:
-            # Generate unique slug for private tenant using full email address
-            # Convert email to slug format: user@example.com -> user_example_com_privateTenant
-            email_slug = request.email.lower().replace('@', '_').replace('.', '_')
-            # Remove any other non-alphanumeric characters except underscore
-            email_slug = ''.join(c if c.isalnum() or c == '_' else '_' for c in email_slug)
-            # Remove multiple underscores
-            email_slug = '_'.join(filter(None, email_slug.split('_')))
-            base_slug = f"{email_slug}_privateTenant"
-            
-            # Find unique slug
-            tenant_slug = base_slug
-            counter = 0
-            while True:
-                existing = supabase.table("tenants").select("id").eq("slug", tenant_slug).limit(1).execute()
-                if not existing.data or len(existing.data) == 0:
-                    break
-                counter += 1
-                tenant_slug = f"{base_slug}_{counter}"
-            
-            # Create private tenant name using full email address - MUST use request.email
-            tenant_name = f"{request.email} (Private Tenant)"
-            
-            # Create private tenant (using service role, bypasses RLS)
-            # Note: insert().execute() returns result with .data property
-            tenant_result = supabase.table("tenants").insert({
-                "name": tenant_name,
-                "slug": tenant_slug,
-                "domain": None,  # Private tenants never have domains
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            }).execute()
-            
-            if not tenant_result.data or len(tenant_result.data) == 0:
-                logger.error(f"Failed to create private tenant for user {user_id}")
-                return SignUpResponse(
-                    success=False,
-                    error="Failed to create private tenant"
-                )
-            
-            tenant_id = tenant_result.data[0]["id"]
-            logger.info(f"Created private tenant {tenant_id} (name: {tenant_name}, slug: {tenant_slug}) for user {user_id}")
-        
-        # Step 4: Create or update user profile with tenant_id (using service role, bypasses RLS)
-        # Check again if profile exists (might have been created by trigger between Step 1.5 and now)
-        existing_profile_check = supabase.table("user_profiles").select("id").eq("id", user_id).limit(1).execute()
-        
-        if existing_profile_check.data and len(existing_profile_check.data) > 0:
-            # Profile exists - update it (don't try to insert)
-            logger.info(f"User profile exists for {user_id}, updating with tenant {tenant_id}")
-            try:
-                update_result = supabase.table("user_profiles").update({
-                    "tenant_id": tenant_id,
-                    "email": request.email,
-                    "full_name": request.full_name,
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", user_id).execute()
                 
-                if not update_result.data:
-                    logger.error(f"Failed to update existing user profile for {user_id}")
-                    # Clean up tenant if update failed
-                    if tenant_id:
-                        try:
-                            tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                            if tenant_check.data and len(tenant_check.data) > 0:
-                                tenant_slug = tenant_check.data[0].get("slug", "")
-                                if tenant_slug.endswith("_privateTenant"):
-                                    supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                                    logger.info(f"Cleaned up orphaned private tenant {tenant_id}")
-                        except Exception as cleanup_error:
-                            logger.error(f"Error cleaning up tenant: {cleanup_error}")
-                    
+                if error_code == 'LG002':
+                    # Every private tenant slug tried was taken; the transaction was rolled back
+                    logger.error(f"Could not allocate a private tenant slug for user {user_id}")
                     return SignUpResponse(
                         success=False,
-                        error="Failed to update user profile"
+                        error="Could not create a private tenant for this account. Please try again."
                     )
-                
-                logger.info(f"Updated existing user profile for {user_id} with tenant {tenant_id}")
-                # Continue to success response below
-            except Exception as update_error:
-                logger.error(f"Error updating profile: {update_error}")
-                # Clean up tenant
-                if tenant_id:
-                    try:
-                        tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                        if tenant_check.data and len(tenant_check.data) > 0:
-                            tenant_slug = tenant_check.data[0].get("slug", "")
-                            if tenant_slug.endswith("_privateTenant"):
-                                supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                                logger.info(f"Cleaned up orphaned private tenant {tenant_id}")
-                    except Exception as cleanup_error:
-                        logger.error(f"Error cleaning up tenant: {cleanup_error}")
-                
-                return SignUpResponse(
-                    success=False,
-                    error="Failed to update user profile"
-                )
-        else:
-            # Profile doesn't exist - create it with retry for race condition
-            # The auth user may not be immediately visible due to transaction timing
-            max_retries = 5
-            retry_delay = 0.5  # seconds
-            last_error = None
-
-            for attempt in range(max_retries):
-                try:
-                    profile_result = supabase.table("user_profiles").insert({
-                        "id": user_id,
-                        "email": request.email,
-                        "full_name": request.full_name,
-                        "tenant_id": tenant_id,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }).execute()
-
-                    if not profile_result.data:
-                        raise Exception("Profile insert returned no data")
-
-                    # Success - break out of retry loop
-                    break
-
-                except PostgrestAPIError as e:
-                    error_dict = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
-                    error_code = error_dict.get('code', '')
-
-                    # Handle foreign key violation (auth user not yet visible)
-                    if error_code == '23503':
-                        last_error = e
-                        if attempt < max_retries - 1:
-                            logger.warning(f"FK violation on attempt {attempt + 1}, auth user may not be visible yet. Retrying in {retry_delay}s...")
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 1.5  # Exponential backoff
-                            continue
-                        else:
-                            logger.error(f"FK violation persisted after {max_retries} attempts")
-                            raise
-
-                    # Handle duplicate key error (user profile already exists - likely from trigger)
-                    elif error_code == '23505':  # Unique violation
-                        logger.warning(f"User profile already exists for {user_id} (likely created by trigger), updating instead")
-
-                        # Update existing profile with tenant_id and other info
-                        try:
-                            update_result = supabase.table("user_profiles").update({
-                                "tenant_id": tenant_id,
-                                "email": request.email,
-                                "full_name": request.full_name,
-                                "updated_at": datetime.utcnow().isoformat()
-                            }).eq("id", user_id).execute()
-
-                            if not update_result.data:
-                                logger.error(f"Failed to update existing user profile for {user_id}")
-                                # Clean up tenant if update failed
-                                if tenant_id:
-                                    try:
-                                        tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                                        if tenant_check.data and len(tenant_check.data) > 0:
-                                            tenant_slug = tenant_check.data[0].get("slug", "")
-                                            if tenant_slug.endswith("_privateTenant"):
-                                                supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                                                logger.info(f"Cleaned up orphaned private tenant {tenant_id}")
-                                    except Exception as cleanup_error:
-                                        logger.error(f"Error cleaning up tenant: {cleanup_error}")
-
-                                return SignUpResponse(
-                                    success=False,
-                                    error="Failed to update user profile"
-                                )
-
-                            logger.info(f"Updated existing user profile for {user_id} with tenant {tenant_id}")
-                            break  # Success - exit retry loop
-                        except Exception as update_error:
-                            logger.error(f"Error updating profile: {update_error}")
-                            # Clean up tenant
-                            if tenant_id:
-                                try:
-                                    tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                                    if tenant_check.data and len(tenant_check.data) > 0:
-                                        tenant_slug = tenant_check.data[0].get("slug", "")
-                                        if tenant_slug.endswith("_privateTenant"):
-                                            supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                                            logger.info(f"Cleaned up orphaned private tenant {tenant_id}")
-                                except Exception as cleanup_error:
-                                    logger.error(f"Error cleaning up tenant: {cleanup_error}")
-
-                            return SignUpResponse(
-                                success=False,
-                                error="Failed to update user profile"
-                            )
-                    else:
-                        # Re-raise other database errors
-                        raise
+                raise
+        
+        if not provision_result.data:
+            logger.error(f"Failed to provision tenant for user {user_id}")
+            return SignUpResponse(
+                success=False,
+                error="Failed to create user profile"
+            )
+        
+        tenant_id = provision_result.data[0]["tenant_id"]
         
         logger.info(f"Successfully created user {user_id} with tenant {tenant_id}")
         
@@ -696,24 +681,11 @@ async def signup(request: SignUpRequest):
         )
         
     except PostgrestAPIError as e:
-        error_dict = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
-        error_code = error_dict.get('code', '')
-        error_message = error_dict.get('message', str(e))
+        error_code = e.code or ''
+        error_message = e.message or str(e)
         
         logger.error(f"Database error in signup: {error_message} (code: {error_code})")
         
-        # Clean up tenant if we created one
-        if tenant_id and user_id:
-            try:
-                tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                if tenant_check.data and len(tenant_check.data) > 0:
-                    tenant_slug = tenant_check.data[0].get("slug", "")
-                    if tenant_slug.endswith("_privateTenant"):
-                        supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                        logger.info(f"Cleaned up orphaned private tenant {tenant_id} after error")
-            except Exception as cleanup_error:
-                logger.error(f"Error cleaning up tenant: {cleanup_error}")
-        
         return SignUpResponse(
             success=False,
             error=f"Database error: {error_message}"
@@ -722,18 +694,6 @@ async def signup(request: SignUpRequest):
     except Exception as e:
         logger.error(f"Error in signup: {e}", exc_info=True)
         
-        # Clean up tenant if we created one
-        if tenant_id and user_id:
-            try:
-                tenant_check = supabase.table("tenants").select("slug").eq("id", tenant_id).execute()
-                if tenant_check.data and len(tenant_check.data) > 0:
-                    tenant_slug = tenant_check.data[0].get("slug", "")
-                    if tenant_slug.endswith("_privateTenant"):
-                        supabase.table("tenants").delete().eq("id", tenant_id).execute()
-                        logger.info(f"Cleaned up orphaned private tenant {tenant_id} after error")
-            except Exception as cleanup_error:
-                logger.error(f"Error cleaning up tenant: {cleanup_error}")
-        
         return SignUpResponse(
             success=False,
             error=str(e)
@@ -758,22 +718,13 @@ async def connect_linkedin(
     
     # Generate state for CSRF protection
     state = secrets.token_urlsafe(32)
-    oauth_states[state] = {
+    await oauth_states.put(state, {
         "user_id": request.user_id,
-        "redirect_uri": request.redirect_uri,
-        "created_at": datetime.utcnow()
-    }
+        "redirect_uri": request.redirect_uri
+    })
     
-    # Build authorization URL
-    params = {
-        "response_type": "code",
-        "client_id": LINKEDIN_CLIENT_ID,
-        "redirect_uri": request.redirect_uri,
-        "state": state,
-        "scope": "openid profile email"  # Request basic profile info
-    }
-    
-    auth_url = f"{LINKEDIN_AUTH_URL}?{urllib.parse.urlencode(params)}"
+    # Build authorization URL (state is already URL-safe base64)
+    auth_url = f"{LINKEDIN_AUTH_URL_PREFIX}&redirect_uri={urllib.parse.quote_plus(request.redirect_uri)}&state={state}"
     
     return LinkedInConnectResponse(
         auth_url=auth_url,
@@ -797,15 +748,15 @@ async def linkedin_callback(
             detail="LinkedIn OAuth is not configured. Please set LINKEDIN_CLIENT_ID and LINKEDIN_CLIENT_SECRET environment variables."
         )
     
-    # Verify state
-    if request.state not in oauth_states:
+    # Verify and consume state (one-time use)
+    state_data = await oauth_states.pop(request.state)
+    
+    if state_data is None:
         return LinkedInCallbackResponse(
             success=False,
             error="Invalid or expired state parameter"
         )
     
-    state_data = oauth_states[request.state]
-    
     # Verify state belongs to this user
     if state_data["user_id"] != request.user_id:
         return LinkedInCallbackResponse(
@@ -813,9 +764,6 @@ async def linkedin_callback(
             error="State mismatch"
         )
     
-    # Clean up state (one-time use)
-    del oauth_states[request.state]
-    
     try:
         # Exchange authorization code for access token
         token_data = {
@@ -826,7 +774,7 @@ async def linkedin_callback(
             "client_secret": LINKEDIN_CLIENT_SECRET
         }
         
-        token_response = requests.post(
+        token_response = await http_client.post(
             LINKEDIN_TOKEN_URL,
             data=token_data,
             headers={"Content-Type": "application/x-www-form-urlencoded"}
@@ -851,25 +799,25 @@ async def linkedin_callback(
             )
         
         # Fetch user profile from LinkedIn
-        # Try OpenID Connect endpoint first
-        profile_response = requests.get(
-            LINKEDIN_PROFILE_API,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-        )
+        profile_headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
         
-        # If OpenID Connect fails, try REST API v2
-        if profile_response.status_code != 200:
-            logger.warning(f"OpenID Connect endpoint failed, trying REST API: {profile_response.text}")
-            profile_response = requests.get(
-                LINKEDIN_REST_API,
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json"
-                }
-            )
+        # Prefer the OpenID Connect endpoint, but request the REST API v2 fallback at the same
+        # time so a failed OpenID Connect call doesn't cost a second sequential round-trip
+        rest_api_task = asyncio.create_task(http_client.get(LINKEDIN_REST_API, headers=profile_headers))
+        # The fallback is often discarded; retrieve its outcome so errors aren't reported as unhandled
+        rest_api_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            profile_response = await http_client.get(LINKEDIN_PROFILE_API, headers=profile_headers)
+            
+            # If OpenID Connect fails, use REST API v2
+            if profile_response.status_code != 200:
+                logger.warning(f"OpenID Connect endpoint failed, trying REST API: {profile_response.text}")
+                profile_response = await rest_api_task
+        finally:
+            rest_api_task.cancel()
         
         if profile_response.status_code != 200:
             logger.error(f"LinkedIn profile fetch failed: {profile_response.text}")
@@ -904,8 +852,12 @@ async def linkedin_callback(
             else:
                 linkedin_profile_url = f"https://www.linkedin.com/in/{linkedin_profile_id}"
         
+        # Read the clock once; connected_at, updated_at and the token expiry share it
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        
         # Calculate token expiration
-        token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+        token_expires_at = now + timedelta(seconds=expires_in)
         
         # Update user profile with LinkedIn data
         update_data = {
@@ -916,15 +868,15 @@ async def linkedin_callback(
             "linkedin_first_name": linkedin_first_name,
             "linkedin_last_name": linkedin_last_name,
             "linkedin_headline": profile_data.get("headline") or None,
-            "linkedin_connected_at": datetime.utcnow().isoformat(),
+            "linkedin_connected_at": now_iso,
             "linkedin_token_expires_at": token_expires_at.isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": now_iso
         }
         
         # Remove None values
         update_data = {k: v for k, v in update_data.items() if v is not None}
         
-        result = supabase.table("user_profiles").update(update_data).eq("id", request.user_id).execute()
+        result = await supabase_rest.table("user_profiles").update(update_data).eq("id", request.user_id).execute()
         
         if not result.data:
             return LinkedInCallbackResponse(
@@ -943,6 +895,44 @@ async def linkedin_callback(
             error=str(e)
         )
 
+async def insert_leads(leads: List[Dict[str, Any]]) -> Tuple[int, Optional[str]]:
+    """Insert leads and return the number of rows created and an error for any failed batch
+
+    Large inserts are split into batches sent concurrently so their round-trips overlap.
+    Rows are inserted with return=minimal so PostgREST doesn't echo them back; a plain
+    insert either stores every row of a request or fails it with an APIError, so a
+    successful request created exactly as many rows as it sent.
+
+    Batches are not atomic with each other: if only some fail, the rows of the
+    successful ones are kept and counted, and the first failure is returned as the
+    error. If every batch fails (or the single insert does), the APIError is raised.
+    """
+    if len(leads) < LEADS_BATCH_THRESHOLD:
+        await supabase_rest.table(Tables.LEADS).insert(leads, returning=ReturnMethod.minimal).execute()
+        return len(leads), None
+    
+    batches = [leads[i:i + LEADS_BATCH_SIZE] for i in range(0, len(leads), LEADS_BATCH_SIZE)]
+    results = await asyncio.gather(
+        *(supabase_rest.table(Tables.LEADS).insert(batch, returning=ReturnMethod.minimal).execute() for batch in batches),
+        return_exceptions=True
+    )
+    
+    leads_created = 0
+    first_error: Optional[BaseException] = None
+    for batch, result in zip(batches, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Lead batch insert failed ({len(batch)} rows): {result}")
+            first_error = first_error or result
+        else:
+            leads_created += len(batch)
+    
+    if first_error is None:
+        return leads_created, None
+    if leads_created == 0:
+        raise first_error
+    error_message = first_error.message if isinstance(first_error, PostgrestAPIError) else str(first_error)
+    return leads_created, f"Saved {leads_created} of {len(leads)} leads: {error_message}"
+
 # API Endpoints
 @app.post("/api/search-linkedin", response_model=LinkedInSearchResponse)
 async def search_linkedin(
@@ -972,15 +962,16 @@ async def search_linkedin(
     if not request.positions or len(request.positions) == 0:
         raise HTTPException(status_code=400, detail="At least one position is required")
     
-    if request.experience_operator not in [">", "<", "="]:
+    if request.experience_operator not in VALID_EXPERIENCE_OPERATORS:
         raise HTTPException(status_code=400, detail="experience_operator must be '>', '<', or '='")
     
     if request.experience_years < 0 or request.experience_years > 30:
         raise HTTPException(status_code=400, detail="experience_years must be between 0 and 30")
     
     try:
-        # Search LinkedIn profiles
-        profiles = linkedin_search_service.search_profiles(
+        # Search LinkedIn profiles (blocking Google Custom Search calls, so run in the threadpool)
+        profiles = await run_in_threadpool(
+            linkedin_search_service.search_profiles,
             locations=request.locations,
             positions=request.positions,
             experience_operator=request.experience_operator,
@@ -989,35 +980,44 @@ async def search_linkedin(
         )
         
         # Prepare leads for insertion (all users have tenant_id now)
-        leads_to_insert = []
-        for profile in profiles:
-            leads_to_insert.append({
+        # is_connected_to_tenant is always False for LinkedIn search results
+        leads_to_insert = [
+            {
                 "tenant_id": tenant_id,
                 "contact_person": profile["name"],
                 "company_name": profile["company"],
                 "role": profile["role"],
                 "contact_email": "",
                 "status": "not_contacted",
-                "is_connected_to_tenant": False,  # Always set to False for LinkedIn search results
-            })
+                "is_connected_to_tenant": False,
+            }
+            for profile in profiles
+        ]
         
         # Insert leads into Supabase
         if leads_to_insert:
             try:
-                result = supabase.table(Tables.LEADS).insert(leads_to_insert).execute()
-                leads_created = len(result.data) if result.data else 0
+                leads_created, insert_error = await insert_leads(leads_to_insert)
             except PostgrestAPIError as e:
-                error_dict = e.args[0] if e.args and isinstance(e.args[0], dict) else {}
-                error_message = error_dict.get('message', str(e))
+                error_message = e.message or str(e)
                 logger.error(f"Database insertion failed: {error_message}")
                 raise HTTPException(
                     status_code=500,
                     detail=f"Database error: {error_message}"
                 )
         else:
-            leads_created = 0
+            leads_created, insert_error = 0, None
+        
+        # Some batches were saved and some failed: report what was actually stored
+        if insert_error:
+            return LinkedInSearchResponse.model_construct(
+                success=False,
+                profiles_found=len(profiles),
+                leads_created=leads_created,
+                error=insert_error
+            )
         
-        return LinkedInSearchResponse(
+        return LinkedInSearchResponse.model_construct(
             success=True,
             profiles_found=len(profiles),
             leads_created=leads_created
@@ -1027,7 +1027,7 @@ async def search_linkedin(
         raise
     except Exception as e:
         logger.error(f"Error in search_linkedin: {e}", exc_info=True)
-        return LinkedInSearchResponse(
+        return LinkedInSearchResponse.model_construct(
             success=False,
             profiles_found=0,
             leads_created=0,
@@ -1042,23 +1042,23 @@ async def get_preferences(
     
     try:
         # Use service role client to bypass RLS (already initialized at module level)
-        result = supabase.table("tenant_preferences").select("*").eq("tenant_id", user_info["tenant_id"]).execute()
+        result = await supabase_rest.table("tenant_preferences").select("*").eq("tenant_id", user_info["tenant_id"]).execute()
         
-        if result.data and len(result.data) > 0:
-            return GetPreferencesResponse(
+        if result.data:
+            return GetPreferencesResponse.model_construct(
                 success=True,
                 preferences=result.data[0]
             )
         else:
             # Return empty preferences if none exist
-            return GetPreferencesResponse(
+            return GetPreferencesResponse.model_construct(
                 success=True,
                 preferences={}
             )
         
     except Exception as e:
         logger.error(f"Error getting preferences: {e}", exc_info=True)
-        return GetPreferencesResponse(
+        return GetPreferencesResponse.model_construct(
             success=False,
             error=str(e)
         )
@@ -1075,74 +1075,26 @@ async def save_preferences(
         raise HTTPException(status_code=403, detail="Tenant ID mismatch")
     
     # Validate inputs
-    if request.experience_operator and request.experience_operator not in [">", "<", "="]:
+    if request.experience_operator and request.experience_operator not in VALID_EXPERIENCE_OPERATORS:
         raise HTTPException(status_code=400, detail="experience_operator must be '>', '<', or '='")
     
     if request.experience_years is not None and (request.experience_years < 0 or request.experience_years > 30):
         raise HTTPException(status_code=400, detail="experience_years must be between 0 and 30")
     
     try:
-        # Build update data (only include fields that are provided)
-        update_data = {
-            "updated_at": datetime.utcnow().isoformat()
-        }
+        # Build update data (only include fields that are provided). Every SavePreferencesRequest
+        # field, tenant_id included, maps 1:1 onto a tenant_preferences column.
+        # updated_at is maintained by the database (column default + update trigger)
+        update_data = request.model_dump(exclude_none=True)
         
-        # Add general preferences if provided
-        if request.target_industry is not None:
-            update_data["target_industry"] = request.target_industry
-        if request.company_size is not None:
-            update_data["company_size"] = request.company_size
-        if request.locations is not None:
-            update_data["locations"] = request.locations
-        if request.target_positions is not None:
-            update_data["target_positions"] = request.target_positions
-        if request.revenue_range is not None:
-            update_data["revenue_range"] = request.revenue_range
-        if request.keywords is not None:
-            update_data["keywords"] = request.keywords
-        if request.notes is not None:
-            update_data["notes"] = request.notes
-        
-        # Add consolidated experience fields if provided
-        if request.experience_operator is not None:
-            update_data["experience_operator"] = request.experience_operator
-        if request.experience_years is not None:
-            update_data["experience_years"] = request.experience_years
-        
-        # Add new fields if provided
-        if request.company_type is not None:
-            update_data["company_type"] = request.company_type
-        if request.technology_stack is not None:
-            update_data["technology_stack"] = request.technology_stack
-        if request.funding_stage is not None:
-            update_data["funding_stage"] = request.funding_stage
-        
-        # Check if preferences record exists using Supabase client
-        # Verify we're using service role by checking the key format
-        if not SUPABASE_SERVICE_KEY.startswith('eyJ'):
-            logger.error("CRITICAL: Service role key format is incorrect! It should start with 'eyJ'")
-            raise HTTPException(status_code=500, detail="Service role key configuration error")
-        
-        # Check if preferences exist
-        existing_result = supabase.table("tenant_preferences").select("id").eq("tenant_id", request.tenant_id).execute()
-        existing_data = existing_result.data if existing_result.data else []
-        
-        if existing_data and len(existing_data) > 0:
-            # Update existing preferences
-            # Service role key bypasses RLS automatically
-            result = supabase.table("tenant_preferences").update(update_data).eq("tenant_id", request.tenant_id).execute()
-        else:
-            # Insert new preferences
-            # Service role key bypasses RLS automatically
-            update_data["tenant_id"] = request.tenant_id
-            logger.info(f"Attempting to insert preferences for tenant_id: {request.tenant_id}")
-            result = supabase.table("tenant_preferences").insert(update_data).execute()
-            logger.info(f"Insert result: {result.data if result.data else 'No data returned'}")
+        # Insert or update in a single round-trip (tenant_preferences.tenant_id is unique)
+        # Service role key bypasses RLS automatically
+        result = await supabase_rest.table("tenant_preferences").upsert(update_data, on_conflict="tenant_id").execute()
         
         if not result:
             raise HTTPException(status_code=500, detail="Failed to save preferences")
         
-        return SavePreferencesResponse(success=True)
+        return SavePreferencesResponse.model_construct(success=True)
         
     except HTTPException:
         raise
@@ -1152,184 +1104,213 @@ async def save_preferences(
         error_message = error_dict.get('message', str(e))
         
         logger.error(f"PostgREST error saving preferences: {error_code} - {error_message}")
-        logger.error(f"Service role key configured: {SUPABASE_SERVICE_KEY[:20] if SUPABASE_SERVICE_KEY else 'NOT SET'}...")
         
         if error_code == '42501':
-            return SavePreferencesResponse(
+            return SavePreferencesResponse.model_construct(
                 success=False,
                 error=f"Permission denied. Service role key may not be configured correctly. Error: {error_message}"
             )
         
-        return SavePreferencesResponse(
+        return SavePreferencesResponse.model_construct(
             success=False,
             error=f"Database error ({error_code}): {error_message}"
         )
     except Exception as e:
         logger.error(f"Error saving preferences: {e}", exc_info=True)
-        logger.error(f"Service role key configured: {SUPABASE_SERVICE_KEY[:20] if SUPABASE_SERVICE_KEY else 'NOT SET'}...")
-        return SavePreferencesResponse(
+        return SavePreferencesResponse.model_construct(
             success=False,
             error=str(e)
         )
 
-@app.options("/api/linkedin/connect")
-async def options_linkedin_connect():
-    """Handle CORS preflight for linkedin/connect endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
-@app.options("/api/linkedin/callback")
-async def options_linkedin_callback():
-    """Handle CORS preflight for linkedin/callback endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
-@app.options("/api/search-linkedin")
-async def options_search_linkedin():
-    """Handle CORS preflight for search-linkedin endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
-@app.options("/api/save-preferences")
-async def options_save_preferences():
-    """Handle CORS preflight for save-preferences endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
-@app.options("/api/get-preferences")
-async def options_get_preferences():
-    """Handle CORS preflight for get-preferences endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
 # Admin Endpoints
-@app.post("/api/admin/generate-leads", response_model=GenerateLeadsResponse)
-async def generate_leads(
-    request: GenerateLeadsRequest,
-    user_info: Dict[str, Any] = Depends(verify_admin)
-):
-    """Generate leads for a tenant based on their preferences and method using agentic workflow"""
+def _generate_leads_response(
+    success: bool,
+    leads_created: int,
+    leads: Optional[List[Dict[str, Any]]] = None,
+    error: Optional[str] = None
+) -> ORJSONResponse:
+    """Render a GenerateLeadsResponse body directly with orjson
+    
+    Returning a Response skips FastAPI's response validation and jsonable_encoder walk,
+    which matter here because preview responses carry every generated lead. The route
+    documents GenerateLeadsResponse via `responses=` rather than response_model for the same reason.
+    """
+    return ORJSONResponse({
+        "success": success,
+        "leads_created": leads_created,
+        "leads": leads,
+        "error": error
+    })
+
+async def _run_lead_generation(tenant_id: str, preview_only: bool) -> Dict[str, Any]:
+    """Generate leads for a tenant from its stored preferences
+    
+    Shared by the synchronous generate-leads endpoint and background generation jobs.
+    Never raises; failures are reported in the returned dict.
+    
+    Returns:
+        Dict with success, leads_created, leads (preview only) and error
+    """
     try:
-        # Get tenant information (name and admin_notes)
-        tenant_result = supabase.table("tenants").select("name, admin_notes").eq("id", request.tenant_id).execute()
-        
-        tenant_name = None
-        admin_notes = None
-        if tenant_result.data and len(tenant_result.data) > 0:
-            tenant_name = tenant_result.data[0].get("name")
-            admin_notes = tenant_result.data[0].get("admin_notes")
-        
-        # Get tenant preferences using Supabase client
-        prefs_result = supabase.table("tenant_preferences").select("*").eq("tenant_id", request.tenant_id).execute()
-        
-        if not prefs_result.data or len(prefs_result.data) == 0:
-            return GenerateLeadsResponse(
-                success=False,
-                leads_created=0,
-                error=f"Tenant preferences not found for tenant {request.tenant_id}. Please configure preferences first in Settings, or ensure lead generation methods are selected in the Admin Dashboard."
-            )
+        # Get tenant preferences with the tenant's name and admin_notes embedded (many-to-one via
+        # tenant_preferences_tenant_id_fkey), so both come back in a single round-trip.
+        # Preferences are read fresh every time: the Admin Dashboard writes lead_generation_method
+        # straight to Supabase right before triggering generation, so a cached copy could be stale.
+        prefs_result = await supabase_rest.table("tenant_preferences").select(
+            "*, tenants(name, admin_notes)"
+        ).eq("tenant_id", tenant_id).limit(1).execute()
+        
+        if not prefs_result.data:
+            return {
+                "success": False,
+                "leads_created": 0,
+                "leads": None,
+                "error": f"Tenant preferences not found for tenant {tenant_id}. Please configure preferences first in Settings, or ensure lead generation methods are selected in the Admin Dashboard."
+            }
         
         preferences = prefs_result.data[0]
+        tenant = preferences.pop("tenants", None) or {}
+        tenant_name = tenant.get("name")
+        admin_notes = tenant.get("admin_notes")
         lead_generation_methods = preferences.get("lead_generation_method")
         
-        if not lead_generation_methods or not isinstance(lead_generation_methods, list) or len(lead_generation_methods) == 0:
-            return GenerateLeadsResponse(
-                success=False,
-                leads_created=0,
-                error="Lead generation methods not set for this tenant. Please select at least one method in the Admin Dashboard first."
-            )
-        
-        # Use workflow orchestrator to generate leads
-        preview_only = request.preview_only or False
+        if not isinstance(lead_generation_methods, list) or not lead_generation_methods:
+            return {
+                "success": False,
+                "leads_created": 0,
+                "leads": None,
+                "error": "Lead generation methods not set for this tenant. Please select at least one method in the Admin Dashboard first."
+            }
         
-        result = workflow_orchestrator.generate_leads(
+        # The orchestrator makes blocking HTTP and LLM calls, so keep it off the event loop
+        result = await run_in_threadpool(
+            workflow_orchestrator.generate_leads,
             methods=lead_generation_methods,
             preferences=preferences,  # Pass full preferences JSON object
-            tenant_id=request.tenant_id,
+            tenant_id=tenant_id,
             max_results_per_method=5,  # Generate 5 leads per method
             tenant_name=tenant_name,
             admin_notes=admin_notes,
             preview_only=preview_only
         )
         
-        # Build error message if any
-        error_msg = None
-        if result.get("errors"):
-            error_msg = "; ".join(result["errors"])
+        # Build error message if any (the orchestrator reports no errors as None)
+        errors = result.get("errors")
+        error_msg = "; ".join(errors) if errors else None
         
-        return GenerateLeadsResponse(
-            success=result["success"],
-            leads_created=result["leads_created"],
-            leads=result.get("leads") if preview_only else None,
-            error=error_msg
-        )
+        return {
+            "success": result["success"],
+            "leads_created": result["leads_created"],
+            "leads": result.get("leads") if preview_only else None,
+            "error": error_msg
+        }
         
     except Exception as e:
         logger.error(f"Error generating leads: {e}", exc_info=True)
-        return GenerateLeadsResponse(
-            success=False,
-            leads_created=0,
-            error=str(e)
-        )
-
-@app.options("/api/admin/generate-leads")
-async def options_admin_generate_leads():
-    """Handle CORS preflight for admin generate leads endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
+        return {
+            "success": False,
+            "leads_created": 0,
+            "leads": None,
+            "error": str(e)
         }
+
+@app.post("/api/admin/generate-leads", responses={200: {"model": GenerateLeadsResponse}})
+async def generate_leads(
+    request: GenerateLeadsRequest,
+    user_info: Dict[str, Any] = Depends(verify_admin)
+):
+    """Generate leads for a tenant based on their preferences and method using agentic workflow"""
+    # The database and orchestrator work with the canonical string form
+    result = await _run_lead_generation(str(request.tenant_id), request.preview_only or False)
+    return _generate_leads_response(**result)
+
+async def _process_lead_generation_job(job_id: str, tenant_id: str, preview_only: bool):
+    """Run a queued generation job and record its outcome on the job row"""
+    try:
+        await supabase_rest.table("lead_generation_jobs").update(
+            {"status": "running"}, returning=ReturnMethod.minimal
+        ).eq("id", job_id).execute()
+        
+        result = await _run_lead_generation(tenant_id, preview_only)
+        
+        await supabase_rest.table("lead_generation_jobs").update({
+            "status": "completed" if result["success"] else "failed",
+            "leads_created": result["leads_created"],
+            "leads": result["leads"],
+            "error": result["error"],
+        }, returning=ReturnMethod.minimal).eq("id", job_id).execute()
+    except Exception as e:
+        logger.error(f"Error recording lead generation job {job_id}: {e}", exc_info=True)
+
+@app.post(
+    "/api/admin/generate-leads/jobs",
+    response_model=GenerateLeadsJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_generate_leads_job(
+    request: GenerateLeadsRequest,
+    background_tasks: BackgroundTasks,
+    user_info: Dict[str, Any] = Depends(verify_admin)
+):
+    """Queue lead generation for a tenant and return immediately with a job id to poll
+    
+    Same input and result as /api/admin/generate-leads, but the request doesn't stay open
+    while the (multi-second) workflow runs.
+    """
+    tenant_id = str(request.tenant_id)
+    preview_only = request.preview_only or False
+    
+    try:
+        job_result = await supabase_rest.table("lead_generation_jobs").insert({
+            "tenant_id": tenant_id,
+            "preview_only": preview_only,
+        }).execute()
+    except PostgrestAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e.message or str(e)}")
+    
+    job_id = job_result.data[0]["id"]
+    background_tasks.add_task(_process_lead_generation_job, job_id, tenant_id, preview_only)
+    
+    return GenerateLeadsJobResponse.model_construct(job_id=job_id, status="pending", leads_created=0)
+
+@app.get("/api/admin/generate-leads/jobs/{job_id}", response_model=GenerateLeadsJobResponse)
+async def get_generate_leads_job(
+    job_id: UUID,
+    user_info: Dict[str, Any] = Depends(verify_admin)
+):
+    """Get the status of a lead generation job, with its result once it has finished
+    
+    A job that has been pending or running longer than LEAD_GENERATION_JOB_TIMEOUT (its
+    process was frozen, restarted or timed out) is marked failed here.
+    """
+    try:
+        job_result = await supabase_rest.table("lead_generation_jobs").select(
+            "id, status, leads_created, leads, error, updated_at"
+        ).eq("id", str(job_id)).limit(1).execute()
+        
+        if not job_result.data:
+            raise HTTPException(status_code=404, detail="Lead generation job not found")
+        
+        job = job_result.data[0]
+        
+        if job["status"] in ("pending", "running"):
+            last_update = datetime.fromisoformat(job["updated_at"])
+            if datetime.now(timezone.utc) - last_update > timedelta(seconds=LEAD_GENERATION_JOB_TIMEOUT):
+                job["status"] = "failed"
+                job["error"] = f"Lead generation job timed out after {LEAD_GENERATION_JOB_TIMEOUT} seconds"
+                # Only fail the job if it hasn't finished in the meantime
+                await supabase_rest.table("lead_generation_jobs").update(
+                    {"status": job["status"], "error": job["error"]}, returning=ReturnMethod.minimal
+                ).eq("id", job["id"]).in_("status", ["pending", "running"]).execute()
+    except PostgrestAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e.message or str(e)}")
+    
+    return GenerateLeadsJobResponse.model_construct(
+        job_id=job["id"],
+        status=job["status"],
+        leads_created=job["leads_created"] or 0,
+        leads=job["leads"],
+        error=job["error"]
     )
 
 @app.post("/api/admin/release-leads", response_model=ReleaseLeadsResponse)
@@ -1347,8 +1328,9 @@ async def release_leads(
                 error="No leads provided to release"
             )
         
-        # Use database service to save leads
-        save_results = database_service.save_leads_and_companies(
+        # Use database service to save leads (sync Supabase client and LLM calls, so run in the threadpool)
+        save_results = await run_in_threadpool(
+            database_service.save_leads_and_companies,
             leads_data=request.leads,
             tenant_id=request.tenant_id
         )
@@ -1369,21 +1351,6 @@ async def release_leads(
             error=str(e)
         )
 
-@app.options("/api/admin/release-leads")
-async def options_admin_release_leads():
-    """Handle CORS preflight for admin release leads endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
-
 @app.post("/api/classify-lead")
 async def classify_lead(request: Request):
     """Classify a lead using LLM"""
@@ -1396,7 +1363,7 @@ async def classify_lead(request: Request):
             raise HTTPException(status_code=400, detail="lead_id and tenant_id are required")
         
         # Fetch lead data
-        lead_result = supabase.table(Tables.LEADS).select("*").eq("id", lead_id).eq("tenant_id", tenant_id).single().execute()
+        lead_result = await supabase_rest.table(Tables.LEADS).select(CLASSIFY_LEAD_COLUMNS).eq("id", lead_id).eq("tenant_id", tenant_id).single().execute()
         
         if not lead_result.data:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -1406,31 +1373,38 @@ async def classify_lead(request: Request):
         # Fetch company data
         company_data = None
         if lead_data.get("company_name"):
-            company_result = supabase.table(Tables.COMPANIES).select("*").eq(
+            company_result = await supabase_rest.table(Tables.COMPANIES).select(CLASSIFY_COMPANY_COLUMNS).eq(
                 "tenant_id", tenant_id
             ).eq("name", lead_data["company_name"]).limit(1).execute()
             
-            if company_result.data and len(company_result.data) > 0:
+            if company_result.data:
                 company_data = company_result.data[0]
         
-        # Classify lead
-        classification = llm_service.classify_lead(
-            {
-                "contact_person": lead_data.get("contact_person", ""),
-                "contact_email": lead_data.get("contact_email", ""),
-                "role": lead_data.get("role", ""),
-                "company_name": lead_data.get("company_name", ""),
-            },
-            company_data
-        )
+        # Classify lead, reusing a recent result for identical prompt input
+        lead_payload = {
+            "contact_person": lead_data.get("contact_person", ""),
+            "contact_email": lead_data.get("contact_email", ""),
+            "role": lead_data.get("role", ""),
+            "company_name": lead_data.get("company_name", ""),
+        }
+        cache_key = hashlib.blake2b(
+            orjson.dumps([lead_payload, company_data], option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).digest()
+        classification = classification_cache.get(cache_key)
+        if classification is None:
+            # The LLM request is blocking, so run it in the threadpool
+            classification = await run_in_threadpool(llm_service.classify_lead, lead_payload, company_data)
+            # Only cache real LLM results; fallbacks (missing key, API error) should be retried
+            if classification.get("classified"):
+                classification_cache[cache_key] = classification
         
         # Update lead with classification
-        update_result = supabase.table(Tables.LEADS).update({
+        await supabase_rest.table(Tables.LEADS).update({
             "tier": classification["tier"],
             "tier_reason": classification["tier_reason"],
             "warm_connections": classification["warm_connections"],
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", lead_id).execute()
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }, returning=ReturnMethod.minimal).eq("id", lead_id).execute()
         
         return {
             "success": True,
@@ -1458,7 +1432,7 @@ async def classify_leads_batch(request: Request):
             raise HTTPException(status_code=400, detail="Maximum 25 leads per batch")
         
         # Fetch all leads
-        lead_results = supabase.table(Tables.LEADS).select("*").eq("tenant_id", tenant_id).in_("id", lead_ids).execute()
+        lead_results = await supabase_rest.table(Tables.LEADS).select(CLASSIFY_LEAD_COLUMNS).eq("tenant_id", tenant_id).in_("id", lead_ids).execute()
         
         if not lead_results.data:
             raise HTTPException(status_code=404, detail="No leads found")
@@ -1470,7 +1444,7 @@ async def classify_leads_batch(request: Request):
         companies_map = {}
         
         if company_names:
-            company_results = supabase.table(Tables.COMPANIES).select("*").eq(
+            company_results = await supabase_rest.table(Tables.COMPANIES).select(CLASSIFY_COMPANY_COLUMNS).eq(
                 "tenant_id", tenant_id
             ).in_("name", company_names).execute()
             
@@ -1492,18 +1466,20 @@ async def classify_leads_batch(request: Request):
                 "company_data": company_data
             })
         
-        # Classify all leads in one LLM call
-        classifications = llm_service.classify_leads_batch(batch_data)
+        # Classify all leads in one LLM call (blocking HTTP, so run in the threadpool)
+        classifications = await run_in_threadpool(llm_service.classify_leads_batch, batch_data)
         
-        # Update all leads with classifications
-        for classification in classifications:
-            lead_id = classification["lead_id"]
-            supabase.table(Tables.LEADS).update({
+        # Update all leads with classifications; the updates are independent, so send them concurrently
+        now_iso = datetime.now(timezone.utc).isoformat()
+        await asyncio.gather(*(
+            supabase_rest.table(Tables.LEADS).update({
                 "tier": classification["tier"],
                 "tier_reason": classification["tier_reason"],
                 "warm_connections": classification["warm_connections"],
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", lead_id).execute()
+                "updated_at": now_iso
+            }, returning=ReturnMethod.minimal).eq("id", classification["lead_id"]).eq("tenant_id", tenant_id).execute()
+            for classification in classifications
+        ))
         
         return {
             "success": True,
@@ -1516,11 +1492,24 @@ async def classify_leads_batch(request: Request):
         logger.error(f"Error classifying leads batch: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to classify leads: {str(e)}")
 
-@app.get("/api/health")
+@app.get("/api/health", response_class=ORJSONResponse)
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok"}
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker per core, but only when OAuth state is shared through Redis; with the
+    # in-process store a callback could land on a worker that never saw its state.
+    # WEB_CONCURRENCY overrides the worker count either way.
+    workers = int(os.getenv("WEB_CONCURRENCY") or (os.cpu_count() if os.getenv("REDIS_URL") else 1))
+    # Run on uvloop with the httptools parser (uvloop has no Windows build, so use asyncio there)
+    uvicorn.run(
+        "app:app" if workers > 1 else app,  # worker processes import the app themselves
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+    )
@@ -5,7 +5,7 @@ Handles saving leads and companies to Supabase
 from typing import List, Dict, Any, Optional
 from supabase import Client
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from utils.location_utils import extract_city_country
 from utils.supabase_utils import Tables
 
@@ -106,6 +106,7 @@ class DatabaseService:
             address = company_data.get("address", "")
             location = extract_city_country(address) if address else ""
             
+            now_iso = datetime.now(timezone.utc).isoformat()
             company_insert = {
                 "tenant_id": tenant_id,
                 "name": company_name,
@@ -114,8 +115,8 @@ class DatabaseService:
                 "sub_industry": company_data.get("sub_industry", ""),
                 "annual_revenue": company_data.get("annual_revenue", ""),
                 "description": company_data.get("description", ""),
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "created_at": now_iso,
+                "updated_at": now_iso
             }
             
             result = self.supabase.table(Tables.COMPANIES).insert(company_insert).execute()
@@ -188,6 +189,7 @@ class DatabaseService:
             elif not isinstance(is_connected_to_tenant, bool):
                 is_connected_to_tenant = False
             
+            now_iso = datetime.now(timezone.utc).isoformat()
             lead_insert = {
                 "tenant_id": tenant_id,
                 "company_name": company_name,
@@ -199,8 +201,8 @@ class DatabaseService:
                 "tier_reason": tier_reason,
                 "warm_connections": warm_connections,
                 "is_connected_to_tenant": is_connected_to_tenant,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "created_at": now_iso,
+                "updated_at": now_iso
             }
             
             result = self.supabase.table(Tables.LEADS).insert(lead_insert).execute()
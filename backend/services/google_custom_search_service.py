@@ -25,6 +25,8 @@ class GoogleCustomSearchService:
         self.api_key = api_key
         self.cse_id = cse_id
         self.search_url = "https://www.googleapis.com/customsearch/v1"
+        # Shared session so repeated searches reuse keep-alive connections
+        self.session = requests.Session()
     
     def search(
         self,
@@ -62,7 +64,7 @@ class GoogleCustomSearchService:
                     "start": start_index
                 }
                 
-                response = requests.get(self.search_url, params=params, timeout=10)
+                response = self.session.get(self.search_url, params=params, timeout=10)
                 
                 if response.status_code != 200:
                     logger.error(f"Google Custom Search API error: {response.status_code} - {response.text}")
@@ -22,6 +22,8 @@ class GooglePlacesService:
         """
         self.api_key = api_key
         self.base_url = "https://places.googleapis.com/v1/places:searchText"
+        # Shared session so repeated searches reuse keep-alive connections
+        self.session = requests.Session()
     
     def search_businesses(
         self,
@@ -70,7 +72,7 @@ class GooglePlacesService:
                 "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.nationalPhoneNumber,places.websiteUri,places.types,places.location,places.businessStatus"
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.base_url,
                 json=payload,
                 headers=headers,
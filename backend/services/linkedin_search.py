@@ -27,6 +27,8 @@ class LinkedInSearchService:
         self.api_key = api_key
         self.cse_id = cse_id
         self.search_url = "https://www.googleapis.com/customsearch/v1"
+        # Shared session so paginated searches reuse keep-alive connections
+        self.session = requests.Session()
         
         if self.cse_id == self.api_key:
             raise ValueError("CSE ID cannot be the same as API key")
@@ -87,9 +89,9 @@ class LinkedInSearchService:
                         profile = self._extract_profile(item, position)
                         if profile:
                             profiles.append(profile)
-                            logger.debug(f"Extracted profile: {profile['name']} - {profile['company']} - {profile['role']}")
+                            logger.debug("Extracted profile: %s - %s - %s", profile['name'], profile['company'], profile['role'])
                         else:
-                            logger.debug(f"Failed to extract profile from: {url}")
+                            logger.debug("Failed to extract profile from: %s", url)
                     
                     time.sleep(0.2)  # Rate limiting (slightly increased)
                     
@@ -135,10 +137,10 @@ class LinkedInSearchService:
             "num": 10
         }
         
-        logger.debug(f"Executing search query: {query}")
+        logger.debug("Executing search query: %s", query)
         
         try:
-            response = requests.get(self.search_url, params=params, timeout=15)
+            response = self.session.get(self.search_url, params=params, timeout=15)
             response.raise_for_status()
             
             data = response.json()
@@ -160,7 +162,7 @@ class LinkedInSearchService:
                 if url and "linkedin.com/in/" in url:
                     linkedin_items.append(item)
                 else:
-                    logger.debug(f"Skipping non-LinkedIn URL: {url}")
+                    logger.debug("Skipping non-LinkedIn URL: %s", url)
             
             return linkedin_items
             
@@ -191,7 +193,7 @@ class LinkedInSearchService:
         
         # Validate we got meaningful data
         if name == "Unknown" and company == "Unknown Company":
-            logger.debug(f"Skipping profile with insufficient data: {url}")
+            logger.debug("Skipping profile with insufficient data: %s", url)
             return None
         
         return {
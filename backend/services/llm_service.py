@@ -32,6 +32,8 @@ class LLMService:
         self.system_prompt_model = "gpt-4o-mini"
         # Use completions API for system prompt generation (simpler, no web search needed)
         self.completions_url = "https://api.openai.com/v1/chat/completions"
+        # Shared session so repeated OpenAI calls reuse keep-alive connections
+        self.session = requests.Session()
     
     def generate_leads(
         self,
@@ -99,7 +101,7 @@ class LLMService:
             
             logger.info(f"Lead generation - Request payload (responses API): {json.dumps(responses_payload, indent=2)}")
             
-            response = requests.post(
+            response = self.session.post(
                 self.base_url,
                 json=responses_payload,
                 headers=headers,
@@ -235,7 +237,7 @@ Return ONLY the system prompt text, without any additional explanation or format
             logger.info(f"System prompt generation - Request payload: {json.dumps(payload, indent=2)}")
             
             # Use completions API for system prompt generation (simpler, no web search needed)
-            response = requests.post(
+            response = self.session.post(
                 self.completions_url,
                 json=payload,
                 headers=headers,
@@ -403,7 +405,7 @@ Make sure the JSON is valid and properly formatted. Include realistic details th
                 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM JSON response: {e}")
-            logger.debug(f"Response content: {content[:500]}")
+            logger.debug("Response content: %.500s", content)
         except Exception as e:
             logger.error(f"Error parsing LLM response: {e}")
         
@@ -422,14 +424,16 @@ Make sure the JSON is valid and properly formatted. Include realistic details th
             company_data: Optional dictionary containing company information (industry, location, description, etc.)
             
         Returns:
-            Dictionary with 'tier' ('good', 'medium', or 'bad'), 'tier_reason' (string), and 'warm_connections' (string)
+            Dictionary with 'tier' ('good', 'medium', or 'bad'), 'tier_reason' (string), 'warm_connections' (string),
+            and 'classified' (False when the LLM couldn't be used and a fallback 'medium' tier was returned)
         """
         if not self.api_key:
             logger.warning("OpenAI API key not configured. Skipping lead classification.")
             return {
                 "tier": "medium",
                 "tier_reason": "Classification unavailable - API key not configured",
-                "warm_connections": ""
+                "warm_connections": "",
+                "classified": False
             }
         
         try:
@@ -469,7 +473,7 @@ Return a JSON object with:
                 "max_tokens": 500
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.completions_url,
                 json=payload,
                 headers=headers,
@@ -481,7 +485,8 @@ Return a JSON object with:
                 return {
                     "tier": "medium",
                     "tier_reason": "Classification failed - API error",
-                    "warm_connections": ""
+                    "warm_connections": "",
+                    "classified": False
                 }
             
             data = response.json()
@@ -497,7 +502,8 @@ Return a JSON object with:
             return {
                 "tier": tier,
                 "tier_reason": classification.get("tier_reason", "No reason provided"),
-                "warm_connections": classification.get("warm_connections", "")
+                "warm_connections": classification.get("warm_connections", ""),
+                "classified": True
             }
             
         except json.JSONDecodeError as e:
@@ -505,14 +511,16 @@ Return a JSON object with:
             return {
                 "tier": "medium",
                 "tier_reason": "Classification failed - invalid response format",
-                "warm_connections": ""
+                "warm_connections": "",
+                "classified": False
             }
         except Exception as e:
             logger.error(f"Error classifying lead: {e}")
             return {
                 "tier": "medium",
                 "tier_reason": f"Classification failed - {str(e)}",
-                "warm_connections": ""
+                "warm_connections": "",
+                "classified": False
             }
     
     def _build_classification_prompt(
@@ -659,7 +667,7 @@ Return a JSON object with:
             response = None
             for attempt in range(max_retries + 1):
                 try:
-                    response = requests.post(
+                    response = self.session.post(
                         self.completions_url,
                         json=payload,
                         headers=headers,
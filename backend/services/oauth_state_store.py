@@ -0,0 +1,71 @@
+"""
+OAuth State Store
+Keeps the CSRF state of in-flight OAuth flows between the connect and callback requests
+"""
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Abandoned OAuth flows are forgotten after this many seconds
+OAUTH_STATE_TTL_SECONDS = 600
+
+OAUTH_STATE_KEY_PREFIX = "oauth_state:"
+
+# Upper bound on in-flight states kept in process memory (oldest are evicted first)
+OAUTH_STATE_MAX_IN_MEMORY = 10_000
+
+
+class OAuthStateStore:
+    """
+    One-time OAuth state storage
+
+    Uses Redis when a URL is configured, so every worker/instance sees the same states and
+    abandoned flows expire on their own. Without Redis, states are kept in a bounded,
+    expiring in-process cache, which only works with a single worker.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = OAUTH_STATE_TTL_SECONDS):
+        """
+        Initialize the OAuth state store
+
+        Args:
+            redis_url: Redis connection URL (optional, falls back to process memory)
+            ttl_seconds: How long a state stays valid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self._states: TTLCache = TTLCache(maxsize=OAUTH_STATE_MAX_IN_MEMORY, ttl=ttl_seconds)
+
+        if self._redis is None:
+            logger.warning("REDIS_URL not set. OAuth state is kept in process memory (single worker only).")
+
+    async def put(self, state: str, data: Dict[str, Any]) -> None:
+        """Store the data for a newly issued state"""
+        if self._redis is None:
+            self._states[state] = data
+            return
+
+        await self._redis.set(f"{OAUTH_STATE_KEY_PREFIX}{state}", json.dumps(data), ex=self.ttl_seconds)
+
+    async def pop(self, state: str) -> Optional[Dict[str, Any]]:
+        """
+        Consume a state (one-time use)
+
+        Returns:
+            The stored data, or None if the state is unknown or expired
+        """
+        if self._redis is None:
+            return self._states.pop(state, None)
+
+        raw = await self._redis.getdel(f"{OAUTH_STATE_KEY_PREFIX}{state}")
+        return json.loads(raw) if raw is not None else None
+
+    async def close(self) -> None:
+        """Close the Redis connection pool, if any"""
+        if self._redis is not None:
+            await self._redis.aclose()
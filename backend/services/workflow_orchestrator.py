@@ -3,6 +3,7 @@ Agentic Workflow Orchestrator
 Coordinates multiple lead generation services based on methods and preferences
 """
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 from .google_places_service import GooglePlacesService
@@ -76,34 +77,42 @@ class WorkflowOrchestrator:
         logger.info(f"Starting lead generation for tenant {tenant_id} with methods: {methods}")
         logger.info(f"Search query: {search_query}")
         logger.info(f"Preferences keys: {list(preferences.keys())}")
-        logger.debug(f"Full preferences: {preferences}")
+        # Lazy %-formatting: the full preferences dict is only rendered when DEBUG is enabled
+        logger.debug("Full preferences: %s", preferences)
         
-        # Process each method
-        for method in methods:
-            try:
+        # Methods are independent (each calls its own external APIs), so run them concurrently.
+        # Results are still collected in method order, so deduplication keeps the same leads.
+        with ThreadPoolExecutor(max_workers=max(len(methods), 1)) as executor:
+            futures = []
+            for method in methods:
                 logger.info(f"Processing method: {method}")
-                leads = self._process_method(
-                    method, 
-                    preferences, 
-                    search_query, 
+                futures.append((method, executor.submit(
+                    self._process_method,
+                    method,
+                    preferences,
+                    search_query,
                     max_results_per_method,
                     tenant_name=tenant_name,
                     admin_notes=admin_notes
-                )
-                
-                if leads:
-                    all_leads.extend(leads)
-                    method_results[method] = len(leads)
-                    logger.info(f"Method {method} generated {len(leads)} leads")
-                else:
-                    method_results[method] = 0
-                    logger.warning(f"Method {method} generated no leads")
+                )))
+            
+            for method, future in futures:
+                try:
+                    leads = future.result()
                     
-            except Exception as e:
-                error_msg = f"Error in method {method}: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                errors.append(error_msg)
-                method_results[method] = 0
+                    if leads:
+                        all_leads.extend(leads)
+                        method_results[method] = len(leads)
+                        logger.info(f"Method {method} generated {len(leads)} leads")
+                    else:
+                        method_results[method] = 0
+                        logger.warning(f"Method {method} generated no leads")
+                        
+                except Exception as e:
+                    error_msg = f"Error in method {method}: {str(e)}"
+                    logger.error(error_msg, exc_info=True)
+                    errors.append(error_msg)
+                    method_results[method] = 0
         
         # Deduplicate leads
         deduplicated_leads = self._deduplicate_leads(all_leads)
@@ -260,7 +269,7 @@ class WorkflowOrchestrator:
             
             if not locations_str or not positions_str:
                 logger.warning("LinkedIn search requires locations and target_positions")
-                logger.debug(f"Available preference keys: {list(preferences.keys())}")
+                logger.debug("Available preference keys: %s", list(preferences))
                 return leads
             
             locations = [loc.strip() for loc in locations_str.split(",") if loc.strip()]
@@ -0,0 +1,11 @@
+-- One preferences row per tenant, so the backend can save preferences with a single
+-- INSERT ... ON CONFLICT (tenant_id) DO UPDATE instead of select-then-insert/update.
+
+-- Keep only the most recently updated row for any tenant that has duplicates
+DELETE FROM tenant_preferences p
+USING tenant_preferences newer
+WHERE p.tenant_id = newer.tenant_id
+  AND (COALESCE(p.updated_at, '-infinity'), p.id) < (COALESCE(newer.updated_at, '-infinity'), newer.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS tenant_preferences_tenant_id_key
+    ON tenant_preferences (tenant_id);
@@ -0,0 +1,20 @@
+-- Let Postgres maintain tenant_preferences.updated_at so the backend does not have to
+-- send a client-side timestamp with every save.
+
+CREATE OR REPLACE FUNCTION tenant_preferences_set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+ALTER TABLE tenant_preferences ALTER COLUMN updated_at SET DEFAULT now();
+
+DROP TRIGGER IF EXISTS tenant_preferences_set_updated_at ON tenant_preferences;
+CREATE TRIGGER tenant_preferences_set_updated_at
+    BEFORE UPDATE ON tenant_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION tenant_preferences_set_updated_at();
@@ -0,0 +1,70 @@
+-- Provision a new user's tenant and profile in one round-trip and one transaction.
+-- Called by the backend's /api/signup right after Supabase Auth has created the user:
+--   * keeps the tenant of an existing profile (e.g. one created by a trigger)
+--   * otherwise assigns the tenant whose domain matches the email domain
+--   * otherwise creates a private tenant with a unique slug
+--   * upserts the user_profiles row with the assigned tenant
+-- A failure anywhere rolls the whole thing back, so no orphaned private tenants are left behind.
+
+-- The slug loop below relies on ON CONFLICT (slug)
+CREATE UNIQUE INDEX IF NOT EXISTS tenants_slug_key ON tenants (slug);
+
+CREATE OR REPLACE FUNCTION signup_provision_tenant(p_user_id uuid, p_email text, p_full_name text)
+RETURNS TABLE (tenant_id uuid)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_tenant_id uuid;
+    v_existing_email text;
+    v_domain text := NULLIF(lower(split_part(p_email, '@', 2)), '');
+    v_base_slug text;
+    v_slug text;
+    v_counter integer := 0;
+BEGIN
+    SELECT p.email, p.tenant_id
+    INTO v_existing_email, v_tenant_id
+    FROM user_profiles p
+    WHERE p.id = p_user_id
+    FOR UPDATE;
+
+    IF v_existing_email IS NOT NULL AND lower(v_existing_email) <> lower(p_email) THEN
+        RAISE EXCEPTION 'User % already exists with a different email', p_user_id
+            USING ERRCODE = 'unique_violation';
+    END IF;
+
+    -- Existing tenant matching the email domain (private tenants never have domains)
+    IF v_tenant_id IS NULL AND v_domain IS NOT NULL THEN
+        SELECT t.id INTO v_tenant_id FROM tenants t WHERE t.domain = v_domain LIMIT 1;
+    END IF;
+
+    -- Private tenant: user@example.com -> user_example_com_privateTenant[_N]
+    IF v_tenant_id IS NULL THEN
+        v_base_slug := trim(BOTH '_' FROM regexp_replace(lower(p_email), '[^[:alnum:]]+', '_', 'g')) || '_privateTenant';
+        v_slug := v_base_slug;
+        LOOP
+            INSERT INTO tenants (name, slug, domain, created_at, updated_at)
+            VALUES (p_email || ' (Private Tenant)', v_slug, NULL, now(), now())
+            ON CONFLICT (slug) DO NOTHING
+            RETURNING id INTO v_tenant_id;
+
+            EXIT WHEN v_tenant_id IS NOT NULL;
+            v_counter := v_counter + 1;
+            v_slug := v_base_slug || '_' || v_counter;
+        END LOOP;
+    END IF;
+
+    INSERT INTO user_profiles (id, email, full_name, tenant_id, created_at, updated_at)
+    VALUES (p_user_id, p_email, p_full_name, v_tenant_id, now(), now())
+    ON CONFLICT (id) DO UPDATE
+        SET email = EXCLUDED.email,
+            full_name = EXCLUDED.full_name,
+            tenant_id = EXCLUDED.tenant_id,
+            updated_at = EXCLUDED.updated_at;
+
+    RETURN QUERY SELECT v_tenant_id;
+END;
+$$;
+
+-- Only the backend (service role) may provision tenants
+REVOKE EXECUTE ON FUNCTION signup_provision_tenant(uuid, text, text) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION signup_provision_tenant(uuid, text, text) TO service_role;
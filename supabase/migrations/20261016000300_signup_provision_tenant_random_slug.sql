@@ -0,0 +1,64 @@
+-- Allocate private tenant slugs with at most two inserts: the plain
+-- <email>_privateTenant slug, then one random-suffixed fallback. Replaces the
+-- _1, _2, ... probing loop from 20261016000200_signup_provision_tenant.sql.
+-- Suffixed slugs still end in _privateTenant, which the admin UI filters on.
+
+CREATE OR REPLACE FUNCTION signup_provision_tenant(p_user_id uuid, p_email text, p_full_name text)
+RETURNS TABLE (tenant_id uuid)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_tenant_id uuid;
+    v_existing_email text;
+    v_domain text := NULLIF(lower(split_part(p_email, '@', 2)), '');
+    v_email_slug text;
+    v_slug text;
+BEGIN
+    SELECT p.email, p.tenant_id
+    INTO v_existing_email, v_tenant_id
+    FROM user_profiles p
+    WHERE p.id = p_user_id
+    FOR UPDATE;
+
+    IF v_existing_email IS NOT NULL AND lower(v_existing_email) <> lower(p_email) THEN
+        RAISE EXCEPTION 'User % already exists with a different email', p_user_id
+            USING ERRCODE = 'unique_violation';
+    END IF;
+
+    -- Existing tenant matching the email domain (private tenants never have domains)
+    IF v_tenant_id IS NULL AND v_domain IS NOT NULL THEN
+        SELECT t.id INTO v_tenant_id FROM tenants t WHERE t.domain = v_domain LIMIT 1;
+    END IF;
+
+    -- Private tenant: user@example.com -> user_example_com_privateTenant. If that slug is
+    -- taken, add a random 24-bit suffix (user_example_com_1a2b3c_privateTenant) and try
+    -- once more instead of probing _1, _2, ... one insert at a time.
+    IF v_tenant_id IS NULL THEN
+        v_email_slug := trim(BOTH '_' FROM regexp_replace(lower(p_email), '[^[:alnum:]]+', '_', 'g'));
+        v_slug := v_email_slug || '_privateTenant';
+
+        INSERT INTO tenants (name, slug, domain, created_at, updated_at)
+        VALUES (p_email || ' (Private Tenant)', v_slug, NULL, now(), now())
+        ON CONFLICT (slug) DO NOTHING
+        RETURNING id INTO v_tenant_id;
+
+        IF v_tenant_id IS NULL THEN
+            v_slug := v_email_slug || '_' || substr(md5(random()::text), 1, 6) || '_privateTenant';
+
+            INSERT INTO tenants (name, slug, domain, created_at, updated_at)
+            VALUES (p_email || ' (Private Tenant)', v_slug, NULL, now(), now())
+            RETURNING id INTO v_tenant_id;
+        END IF;
+    END IF;
+
+    INSERT INTO user_profiles (id, email, full_name, tenant_id, created_at, updated_at)
+    VALUES (p_user_id, p_email, p_full_name, v_tenant_id, now(), now())
+    ON CONFLICT (id) DO UPDATE
+        SET email = EXCLUDED.email,
+            full_name = EXCLUDED.full_name,
+            tenant_id = EXCLUDED.tenant_id,
+            updated_at = EXCLUDED.updated_at;
+
+    RETURN QUERY SELECT v_tenant_id;
+END;
+$$;
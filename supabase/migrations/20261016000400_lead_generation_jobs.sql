@@ -0,0 +1,38 @@
+-- Background lead generation jobs for POST /api/admin/generate-leads/jobs.
+-- The backend inserts a pending row, runs the workflow after responding, and records
+-- the outcome here; admins poll GET /api/admin/generate-leads/jobs/{id}.
+
+CREATE TABLE IF NOT EXISTS lead_generation_jobs (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    tenant_id uuid NOT NULL REFERENCES tenants (id) ON DELETE CASCADE,
+    status text NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    preview_only boolean NOT NULL DEFAULT false,
+    leads_created integer NOT NULL DEFAULT 0,
+    leads jsonb,
+    error text,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS lead_generation_jobs_tenant_id_idx
+    ON lead_generation_jobs (tenant_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION lead_generation_jobs_set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS lead_generation_jobs_set_updated_at ON lead_generation_jobs;
+CREATE TRIGGER lead_generation_jobs_set_updated_at
+    BEFORE UPDATE ON lead_generation_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION lead_generation_jobs_set_updated_at();
+
+-- Only the backend (service role, which bypasses RLS) reads and writes jobs
+ALTER TABLE lead_generation_jobs ENABLE ROW LEVEL SECURITY;
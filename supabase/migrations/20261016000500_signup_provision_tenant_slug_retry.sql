@@ -0,0 +1,71 @@
+-- Make private tenant slug allocation collision-safe and give signup_provision_tenant's
+-- own failures distinct SQLSTATEs. Replaces the function from
+-- 20261016000300_signup_provision_tenant_random_slug.sql, whose random-suffixed insert
+-- had no ON CONFLICT and surfaced a (rare) suffix collision as a 23505 that the backend
+-- reported as "user already exists".
+--   LG001: the user already has a profile with a different email
+--   LG002: no free private tenant slug was found after a few random suffixes
+
+CREATE OR REPLACE FUNCTION signup_provision_tenant(p_user_id uuid, p_email text, p_full_name text)
+RETURNS TABLE (tenant_id uuid)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_tenant_id uuid;
+    v_existing_email text;
+    v_domain text := NULLIF(lower(split_part(p_email, '@', 2)), '');
+    v_email_slug text;
+    v_slug text;
+    v_attempt integer := 0;
+BEGIN
+    SELECT p.email, p.tenant_id
+    INTO v_existing_email, v_tenant_id
+    FROM user_profiles p
+    WHERE p.id = p_user_id
+    FOR UPDATE;
+
+    IF v_existing_email IS NOT NULL AND lower(v_existing_email) <> lower(p_email) THEN
+        RAISE EXCEPTION 'User % already exists with a different email', p_user_id
+            USING ERRCODE = 'LG001';
+    END IF;
+
+    -- Existing tenant matching the email domain (private tenants never have domains)
+    IF v_tenant_id IS NULL AND v_domain IS NOT NULL THEN
+        SELECT t.id INTO v_tenant_id FROM tenants t WHERE t.domain = v_domain LIMIT 1;
+    END IF;
+
+    -- Private tenant: user@example.com -> user_example_com_privateTenant. If that slug is
+    -- taken, retry with a fresh random 24-bit suffix (user_example_com_1a2b3c_privateTenant)
+    -- a few times; a suffix collision just skips the insert instead of aborting signup.
+    IF v_tenant_id IS NULL THEN
+        v_email_slug := trim(BOTH '_' FROM regexp_replace(lower(p_email), '[^[:alnum:]]+', '_', 'g'));
+        v_slug := v_email_slug || '_privateTenant';
+
+        LOOP
+            INSERT INTO tenants (name, slug, domain, created_at, updated_at)
+            VALUES (p_email || ' (Private Tenant)', v_slug, NULL, now(), now())
+            ON CONFLICT (slug) DO NOTHING
+            RETURNING id INTO v_tenant_id;
+
+            EXIT WHEN v_tenant_id IS NOT NULL;
+
+            v_attempt := v_attempt + 1;
+            IF v_attempt > 5 THEN
+                RAISE EXCEPTION 'Could not allocate a private tenant slug for %', p_email
+                    USING ERRCODE = 'LG002';
+            END IF;
+            v_slug := v_email_slug || '_' || substr(md5(random()::text), 1, 6) || '_privateTenant';
+        END LOOP;
+    END IF;
+
+    INSERT INTO user_profiles (id, email, full_name, tenant_id, created_at, updated_at)
+    VALUES (p_user_id, p_email, p_full_name, v_tenant_id, now(), now())
+    ON CONFLICT (id) DO UPDATE
+        SET email = EXCLUDED.email,
+            full_name = EXCLUDED.full_name,
+            tenant_id = EXCLUDED.tenant_id,
+            updated_at = EXCLUDED.updated_at;
+
+    RETURN QUERY SELECT v_tenant_id;
+END;
+$$;